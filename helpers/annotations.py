@@ -2,7 +2,7 @@
 from dataclasses import dataclass, field
 from enum import Enum
 import os
-from helpers.boxes import RectCheckFit, RectToXYWH, XYWHToRect
+import numpy as np
 from helpers.files import ChangeExtension
 
 
@@ -40,32 +40,35 @@ class Annotations:
 def ReadAnnotations(imagePath: str) -> list:
     '''Read annotations from file.'''
     annotations = Annotations(imagePath)
+    annotationsPath = ChangeExtension(imagePath, '.txt')
 
     # YOLO format : <object-class> <x> <y> <width> <height>
-    if (os.path.exists(ChangeExtension(imagePath, '.txt'))):
+    if (os.path.exists(annotationsPath)):
         # Format : Set
         annotations.dataformat = AnnotationsFormat.YOLO
         annotations.exists = True
 
-        # File : Open file
-        with open(ChangeExtension(imagePath, '.txt'), 'r') as f:
-            for line in f:
-                # Skip empty lines
-                if not line.strip():
-                    continue
-
-                txtAnnote = (line.rstrip('\n').split(' '))
-                # Class number : Get
-                classNumber = int(txtAnnote[0])
-                # Bbox : Get
-                box = [float(txtAnnote[1]), float(txtAnnote[2]),
-                       float(txtAnnote[3]), float(txtAnnote[4])]
-                rect = XYWHToRect(box)
-                rect = RectCheckFit(rect)
-                boxFitted = RectToXYWH(rect)
-
-                # Annotations : Append
-                annotations.Append(boxFitted + [f'C{classNumber}'])
+        # File : Read non empty lines
+        with open(annotationsPath, 'r') as f:
+            lines = [line for line in f if line.strip()]
+
+        if (len(lines) != 0):
+            # Parse : All lines at once, <object-class> <x> <y> <width> <height>
+            data = np.loadtxt(lines, usecols=range(5), ndmin=2)
+            classNumbers = data[:, 0].astype(int).tolist()
+            x, y, w, h = data[:, 1], data[:, 2], data[:, 3], data[:, 4]
+
+            # Bbox : Corners fitted to 0..1, same as RectCheckFit
+            x1 = np.clip(x - w / 2, 0, 1)
+            y1 = np.clip(y - h / 2, 0, 1)
+            x2 = np.clip(x + w / 2, 0, 1)
+            y2 = np.clip(y + h / 2, 0, 1)
+            boxesFitted = np.stack(
+                [(x1 + x2) / 2, (y1 + y2) / 2, np.abs(x2 - x1), np.abs(y2 - y1)], axis=1).tolist()
+
+            # Annotations : Set
+            annotations.annotations = [
+                box + [f'C{classNumber}'] for box, classNumber in zip(boxesFitted, classNumbers)]
 
     return annotations
 
@@ -1,16 +1,47 @@
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 import albumentations as A
 import cv2
+import numpy as np
 
 from helpers.annotations import Annotations, SaveAnnotations
-from helpers.files import ChangeExtension
+from helpers.files import ChangeExtension, GetExtension, ReadBinaryFile
 from helpers.hashing import GetRandomSha1
+from helpers.transforms import FastRain, FastSunFlare
+
+try:
+    from turbojpeg import TJPF_BGR, TJSAMP_420, TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+# JPEG : Extensions handled by libjpeg-turbo
+jpegExtensions = [".jpg", ".jpeg"]
+# JPEG : Quality of saved images, same as OpenCV default
+jpegQuality = 95
+
+# Writer : Threads saving outputs, encoding releases GIL
+writer = ThreadPoolExecutor(max_workers=4)
+
+
+@dataclass
+class Transformation:
+    """Named transformation applied by AugmentMany."""
+
+    # Name of transformation, used in filename
+    name: str
+    # Albumentations transform
+    transformations: A.Compose
+    # Transform bboxes together with image
+    is_bboxes_transform: bool = True
 
 
 # Shape : Albumentations transform
+@lru_cache(maxsize=8)
 def transform_crop_make(width: int = 640) -> A.Compose:
     """Create crop transformation."""
 
@@ -28,6 +59,7 @@ def transform_crop_make(width: int = 640) -> A.Compose:
     )
 
 
+@lru_cache(maxsize=8)
 def transform_rotate_make(degrees: int = 30) -> A.Compose:
     """Create rotate transformation."""
 
@@ -44,6 +76,7 @@ def transform_rotate_make(degrees: int = 30) -> A.Compose:
     )
 
 
+@lru_cache(maxsize=8)
 def transform_randrotate_make(degrees: int = 30) -> A.Compose:
     """Create rotate transformation."""
 
@@ -88,6 +121,21 @@ def transform_flip_make() -> A.Compose:
 # Shape : Albumentations transform
 transform_shape = A.Compose(
     [
+        # Geometry : Crop first, so following transforms process less pixels
+        A.SomeOf(
+            [
+                A.RandomCrop(width=480, height=320, p=0.60),
+                A.Affine(
+                    translate_percent=(-0.1, 0.1),
+                    scale=(0.8, 1.2),
+                    rotate=(-15, 15),
+                    keep_ratio=True,
+                    mode=cv2.BORDER_CONSTANT,
+                    p=0.25,
+                ),
+            ],
+            n=1,
+        ),
         A.SomeOf(
             [
                 A.ImageCompression(quality_lower=30, quality_upper=55, p=0.1),
@@ -95,28 +143,21 @@ transform_shape = A.Compose(
             ],
             n=2,
         ),
-        A.GridDistortion(num_steps=3, distort_limit=0.25, p=0.1),
-        A.SomeOf(
+        # Distortion : At most one displacement map remap per image
+        A.OneOf(
             [
-                A.RandomCrop(width=480, height=320, p=0.60),
-                A.ShiftScaleRotate(
-                    shift_limit=0.1,
-                    scale_limit=0.2,
-                    rotate_limit=15,
-                    p=0.25,
-                    border_mode=cv2.BORDER_CONSTANT,
-                ),
+                A.GridDistortion(num_steps=3, distort_limit=0.25, p=0.1),
                 A.ElasticTransform(
                     alpha_affine=9, p=0.2, border_mode=cv2.BORDER_CONSTANT
                 ),
+                A.OpticalDistortion(
+                    distort_limit=0.2, p=0.2, border_mode=cv2.BORDER_CONSTANT
+                ),
             ],
-            n=1,
+            p=0.5,
         ),
         A.SomeOf(
             [
-                A.OpticalDistortion(
-                    distort_limit=0.2, p=0.2, border_mode=cv2.BORDER_CONSTANT
-                ),
                 A.ZoomBlur(max_factor=1.1, p=0.2),
                 A.GaussNoise(p=0.2),
                 A.RandomShadow(p=0.1),
@@ -273,7 +314,7 @@ def transform_snow_make() -> A.Compose:
 def transform_rain_make() -> A.Compose:
     """Create rain transformation."""
     return A.Compose(
-        [A.RandomRain(drop_length=10, blur_value=4, p=0.999)],
+        [FastRain(drop_length=10, blur_value=4, p=0.999)],
         bbox_params=A.BboxParams(format="yolo", min_area=100, min_visibility=0.3),
     )
 
@@ -302,6 +343,7 @@ def transform_spatter_small_make() -> A.Compose:
     )
 
 
+@lru_cache(maxsize=8)
 def transform_blackboxing_make(size: int = 50) -> A.Compose:
     """Blackboxing parts of image."""
     logging.warning("Blackboxing not supports bbox target!")
@@ -379,7 +421,7 @@ def transform_sunflare_make() -> A.Compose:
     """Create sunflare transformation."""
     return A.Compose(
         [
-            A.RandomSunFlare(
+            FastSunFlare(
                 src_radius=260,
                 num_flare_circles_lower=2,
                 num_flare_circles_upper=6,
@@ -406,6 +448,7 @@ transform_color = A.Compose(
             n=2,
         ),
         # Quality : Jpeg compression, multiplicative noise, downscale
+        # - p is a weight, slow Superpixels and GlassBlur are chosen rarely
         A.OneOf(
             [
                 A.ImageCompression(quality_lower=30, quality_upper=55, p=0.3),
@@ -415,16 +458,16 @@ transform_color = A.Compose(
                 A.ISONoise(color_shift=(0.01, 0.08), intensity=(0.2, 0.8), p=0.1),
                 A.PixelDropout(dropout_prob=0.1, p=0.1),
                 A.Spatter(p=0.1),
-                A.Superpixels(p=0.1),
-                A.GlassBlur(sigma=0.2, max_delta=2, iterations=1, p=0.1),
+                A.Superpixels(p=0.02),
+                A.GlassBlur(sigma=0.2, max_delta=2, iterations=1, p=0.02),
             ]
         ),
         # Weather : Dropouts, rain, snow, sun flare, fog
         A.OneOf(
             [
-                A.RandomRain(drop_length=10, blur_value=4, p=0.1),
+                FastRain(drop_length=10, blur_value=4, p=0.1),
                 A.RandomSnow(p=0.1),
-                A.RandomSunFlare(
+                FastSunFlare(
                     src_radius=260,
                     num_flare_circles_lower=2,
                     num_flare_circles_upper=6,
@@ -449,6 +492,86 @@ transform_all = A.Compose(
 )
 
 
+@lru_cache(maxsize=None)
+def GetTurboJpeg() -> Optional["TurboJPEG"]:
+    """Returns libjpeg-turbo codec or None if not available."""
+    if TurboJPEG is None:
+        return None
+
+    try:
+        return TurboJPEG()
+    except (OSError, RuntimeError) as e:
+        logging.warning(f"libjpeg-turbo not available, using OpenCV: {e}")
+        return None
+
+
+def ReadImage(imagePath: str) -> Optional[np.ndarray]:
+    """Read image as BGR array, JPEG files are decoded by libjpeg-turbo."""
+    try:
+        data = ReadBinaryFile(imagePath)
+    except OSError:
+        return None
+
+    # Check : Empty file
+    if len(data) == 0:
+        return None
+
+    # EXIF : OpenCV applies orientation, libjpeg-turbo does not
+    turbojpeg = GetTurboJpeg()
+    if (
+        (turbojpeg is not None)
+        and (GetExtension(imagePath).lower() in jpegExtensions)
+        and (b"Exif\x00\x00" not in data[:65536])
+    ):
+        try:
+            return turbojpeg.decode(data, pixel_format=TJPF_BGR)
+        except OSError as e:
+            # Fallback : OpenCV decodes also CMYK or slightly malformed JPEGs
+            logging.debug(f"libjpeg-turbo failed on {imagePath}, using OpenCV: {e}")
+
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def WriteImage(outputFilepath: str, image: np.ndarray) -> bool:
+    """Write image, JPEG files are encoded by libjpeg-turbo."""
+    # NumPy : Raw uint8 HxWxC array, loadable by np.load(mmap_mode="r")
+    if GetExtension(outputFilepath).lower() == ".npy":
+        np.save(outputFilepath, image)
+        return True
+
+    turbojpeg = GetTurboJpeg()
+    if (turbojpeg is None) or (
+        GetExtension(outputFilepath).lower() not in jpegExtensions
+    ):
+        return cv2.imwrite(outputFilepath, image)
+
+    data = turbojpeg.encode(
+        np.ascontiguousarray(image),
+        quality=jpegQuality,
+        pixel_format=TJPF_BGR,
+        jpeg_subsample=TJSAMP_420,
+    )
+    with open(outputFilepath, "wb") as f:
+        f.write(data)
+
+    return True
+
+
+def SaveOutputs(
+    outputFilepath: str, image: np.ndarray, annotations: Optional[Annotations]
+) -> bool:
+    """Save augmented image and its annotations, if any."""
+    # Image : Save
+    if not WriteImage(outputFilepath, image):
+        logging.error(f"Image not saved: {outputFilepath}!")
+        return False
+    # Annotations : Save
+    if annotations is not None:
+        SaveAnnotations(ChangeExtension(outputFilepath, ".txt"), annotations)
+
+    return True
+
+
 def Augment(
     imagePath: str,
     outputDirectory: str,
@@ -457,16 +580,24 @@ def Augment(
     transformation_name: str,
     is_bboxes_transform: bool = True,
     use_sha: bool = True,
+    image: Optional[np.ndarray] = None,
+    output_format: str = "jpeg",
+    futures: Optional[list] = None,
 ) -> Optional[str]:
-    """Read image, augment image and bboxes and save it to new file."""
+    """Read image, augment image and bboxes and save it to new file.
 
-    # Read image
-    image = cv2.imread(imagePath)
+    If futures list is given, file is saved by writer thread and its future
+    is appended to list.
+    """
+
+    # Read image : Only if not already read
+    if image is None:
+        image = ReadImage(imagePath)
     if image is None:
         logging.error(f"Image not found: {imagePath}!")
         return None
 
-    # Augmentate image
+    # Augmentate image : BGR as read and written by OpenCV, no color conversion
     if is_bboxes_transform:
         transformed = transformations(image=image, bboxes=annotations.annotations)
         new_annotations = transformed["bboxes"]
@@ -481,17 +612,95 @@ def Augment(
 
     # Create filename
     if use_sha:
-        outputFilepath = os.path.join(outputDirectory, f"{GetRandomSha1()}.jpeg")
+        outputFilepath = os.path.join(
+            outputDirectory, f"{GetRandomSha1()}.{output_format}"
+        )
     else:
         base_filename = os.path.splitext(os.path.basename(imagePath))[0]
         outputFilepath = os.path.join(
-            outputDirectory, f"{base_filename}_{transformation_name}.jpeg"
+            outputDirectory, f"{base_filename}_{transformation_name}.{output_format}"
         )
 
-    # Image : Save
-    cv2.imwrite(outputFilepath, transformed["image"])
     # Annotations : Save only if original exists
-    if annotations.exists:
-        SaveAnnotations(ChangeExtension(outputFilepath, ".txt"), newAnnotations)
+    if not annotations.exists:
+        newAnnotations = None
+
+    # Save : In writer thread, next transformation runs meanwhile
+    if futures is not None:
+        futures.append(
+            writer.submit(
+                SaveOutputs, outputFilepath, transformed["image"], newAnnotations
+            )
+        )
+        return outputFilepath
+
+    if not SaveOutputs(outputFilepath, transformed["image"], newAnnotations):
+        return None
 
     return outputFilepath
+
+
+def AugmentMany(
+    imagePath: str,
+    outputDirectory: str,
+    annotations: Annotations,
+    transformations_list: list,
+    use_sha: bool = True,
+    image: Optional[np.ndarray] = None,
+    output_format: str = "jpeg",
+) -> list:
+    """Read image once, augment it by every transformation.
+
+    Files are saved by writer threads, returns pending saves as (path, futures)
+    pairs, which are resolved by GetCreatedPaths.
+    """
+
+    # Read image : Once for all transformations, if not already read
+    if image is None:
+        image = ReadImage(imagePath)
+    if image is None:
+        logging.error(f"Image not found: {imagePath}!")
+        return []
+
+    saving = []
+    for transformation in transformations_list:
+        futures: list = []
+        try:
+            created_path = Augment(
+                imagePath,
+                outputDirectory,
+                annotations,
+                transformation.transformations,
+                transformation_name=transformation.name,
+                is_bboxes_transform=transformation.is_bboxes_transform,
+                use_sha=use_sha,
+                image=image,
+                output_format=output_format,
+                futures=futures,
+            )
+        except Exception as e:
+            logging.error(f"Augmentation {transformation.name} failed: {e}")
+            continue
+
+        if created_path is not None:
+            saving.append((created_path, futures))
+
+    return saving
+
+
+def IsSaved(saving: list) -> bool:
+    """Returns True if all pending saves of image are finished."""
+    return all(future.done() for _, futures in saving for future in futures)
+
+
+def GetCreatedPaths(saving: list) -> list:
+    """Wait for pending saves of image, returns paths saved successfully."""
+    created_paths = []
+    for created_path, futures in saving:
+        try:
+            if all(future.result() for future in futures):
+                created_paths.append(created_path)
+        except Exception as e:
+            logging.error(f"Saving {created_path} failed: {e}")
+
+    return created_paths
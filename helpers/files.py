@@ -140,6 +140,15 @@ def ChangeExtension(path: str, extension: str) -> str:
     return path + extension
 
 
+def ReadBinaryFile(path: str) -> bytes:
+    ''' Read whole file at once, hinting sequential access.'''
+    with open(path, 'rb') as f:
+        # Linux : Hint kernel to read ahead aggressively
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f.read()
+
+
 def Copyfile(src: str, dst: str) -> str:
     ''' Handle standard copyfile method with all
     possible exceptions.'''
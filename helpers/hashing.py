@@ -3,6 +3,7 @@ Created on 12 lis 2020
 
 @author: spasz
 '''
+import secrets
 
 
 def GetHexList():
@@ -24,14 +25,7 @@ def IsSha1Name(name):
                 
     return result
 
-counter = 0
+
 def GetRandomSha1() -> str:
-    '''Create image name'''
-    import hashlib
-    import datetime
-    global counter
-    m = hashlib.sha1()
-    m.update(str(counter).encode('ASCII'))
-    m.update(str(datetime.datetime.now().timestamp()).encode('ASCII'))
-    counter+=1
-    return m.hexdigest()
\ No newline at end of file
+    '''Create random SHA-1 like image name (40 hex characters).'''
+    return secrets.token_hex(20)
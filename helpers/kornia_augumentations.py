@@ -0,0 +1,147 @@
+"""
+    Kornia GPU augmentations, used with --device cuda
+"""
+
+from typing import Optional
+
+import numpy as np
+
+try:
+    import kornia.augmentation as K
+    import torch
+except ImportError:
+    K = None
+    torch = None
+
+
+class KorniaCompose:
+    """Kornia augmentations called like A.Compose, with yolo bboxes."""
+
+    def __init__(
+        self,
+        transforms: list,
+        device: str = "cuda",
+        min_area: float = 100,
+        min_visibility: float = 0.3,
+    ):
+        self.device = torch.device(device)
+        self.augmentation = K.AugmentationSequential(
+            *transforms, data_keys=["input", "bbox_xyxy"]
+        ).to(self.device)
+        self.min_area = min_area
+        self.min_visibility = min_visibility
+
+    def __call__(self, image: np.ndarray, bboxes: Optional[list] = None) -> dict:
+        """Augment BGR uint8 image and yolo bboxes on device."""
+        height, width = image.shape[:2]
+
+        # Image : HxWxC uint8 BGR to 1xCxHxW float RGB, converted on device
+        tensor = torch.from_numpy(np.ascontiguousarray(image)).to(self.device)
+        tensor = tensor.permute(2, 0, 1).flip(0).unsqueeze(0).float() / 255
+
+        # Bboxes : None, transform only image
+        if not bboxes:
+            tensor = self.augmentation(tensor, data_keys=["input"])
+            return {"image": self.ToImage(tensor), "bboxes": []}
+
+        # Bboxes : Yolo normalized to pixel corners
+        boxes = np.array([box[:4] for box in bboxes], dtype=np.float32)
+        x, y, w, h = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+        corners = np.stack(
+            [
+                (x - w / 2) * width,
+                (y - h / 2) * height,
+                (x + w / 2) * width,
+                (y + h / 2) * height,
+            ],
+            axis=1,
+        )
+        tensor, corners = self.augmentation(
+            tensor, torch.from_numpy(corners).unsqueeze(0).to(self.device)
+        )
+        corners = corners[0].cpu().numpy()
+
+        # Bboxes : Clip to image and filter as A.BboxParams does
+        clipped = np.clip(corners, 0, [width, height, width, height])
+        area = (corners[:, 2] - corners[:, 0]) * (corners[:, 3] - corners[:, 1])
+        clipped_area = (clipped[:, 2] - clipped[:, 0]) * (clipped[:, 3] - clipped[:, 1])
+        visible = (clipped_area >= self.min_area) & (
+            clipped_area >= self.min_visibility * area
+        )
+
+        new_bboxes = []
+        for i in np.flatnonzero(visible):
+            x1, y1, x2, y2 = clipped[i]
+            new_bboxes.append(
+                [
+                    float((x1 + x2) / 2 / width),
+                    float((y1 + y2) / 2 / height),
+                    float((x2 - x1) / width),
+                    float((y2 - y1) / height),
+                ]
+                + list(bboxes[i][4:])
+            )
+
+        return {"image": self.ToImage(tensor), "bboxes": new_bboxes}
+
+    @staticmethod
+    def ToImage(tensor: "torch.Tensor") -> np.ndarray:
+        """Convert 1xCxHxW float RGB tensor back to HxWxC uint8 BGR image."""
+        tensor = (tensor[0].clamp(0, 1) * 255).round().byte()
+        return tensor.flip(0).permute(1, 2, 0).contiguous().cpu().numpy()
+
+
+def CheckKornia(device: str = "cuda"):
+    """Raise error if kornia or torch are not installed or device is not usable."""
+    if K is None:
+        raise ImportError("GPU augmentations require torch and kornia packages!")
+
+    # Device : CUDA must be available and index in range, fail before any image
+    if not torch.cuda.is_available():
+        raise RuntimeError(f"Device {device} requested, but CUDA is not available!")
+    index = torch.device(device).index
+    if (index is not None) and (index >= torch.cuda.device_count()):
+        raise RuntimeError(
+            f"Device {device} requested, but only {torch.cuda.device_count()} CUDA devices found!"
+        )
+
+
+def shape_gpu_transforms() -> list:
+    """Kornia shape transforms, similar to transform_shape."""
+    return [
+        K.RandomAffine(degrees=15, translate=(0.1, 0.1), scale=(0.8, 1.2), p=0.25),
+        K.RandomMotionBlur(kernel_size=3, angle=35.0, direction=0.5, p=0.1),
+        K.RandomGaussianNoise(mean=0.0, std=0.05, p=0.2),
+    ]
+
+
+def color_gpu_transforms() -> list:
+    """Kornia color transforms, similar to transform_color."""
+    return [
+        K.ColorJitter(brightness=0.2, contrast=0.2, saturation=0.2, hue=0.05, p=0.3),
+        K.RandomEqualize(p=0.3),
+        K.RandomGaussianBlur(kernel_size=(3, 3), sigma=(0.1, 2.0), p=0.2),
+        K.RandomGaussianNoise(mean=0.0, std=0.05, p=0.2),
+    ]
+
+
+def transform_shape_gpu_make(device: str = "cuda") -> KorniaCompose:
+    """Create shape transformation on device."""
+    CheckKornia(device)
+    return KorniaCompose(shape_gpu_transforms(), device=device)
+
+
+def transform_color_gpu_make(device: str = "cuda") -> KorniaCompose:
+    """Create color transformation on device."""
+    CheckKornia(device)
+    return KorniaCompose(color_gpu_transforms(), device=device, min_visibility=0.2)
+
+
+def transform_all_gpu_make(device: str = "cuda") -> KorniaCompose:
+    """Create shape and color transformation on device."""
+    CheckKornia(device)
+    return KorniaCompose(
+        shape_gpu_transforms() + color_gpu_transforms(),
+        device=device,
+        min_visibility=0.2,
+    )
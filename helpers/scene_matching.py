@@ -42,18 +42,3 @@ def transform_storm_make() -> A.Compose:
         ],
         bbox_params=A.BboxParams(format="yolo", min_area=100, min_visibility=0.3),
     )
-
-
-# def transform_night_make() -> A.Compose:
-#     """Create night transformation."""
-#     return A.Compose(
-#         [
-#             A.HistogramMatching(
-#                 reference_images=[image_night],
-#                 read_fn=lambda x: x,
-#                 blend_ratio=(0.8, 0.8),
-#                 p=1.0,
-#             )
-#         ],
-#         bbox_params=A.BboxParams(format="yolo", min_area=100, min_visibility=0.3),
-#     )
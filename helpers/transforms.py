@@ -0,0 +1,189 @@
+"""
+    Albumentations transforms with faster implementations
+"""
+
+import random
+from functools import lru_cache
+
+import albumentations as A
+import cv2
+import numpy as np
+
+
+def add_rain(
+    image: np.ndarray,
+    slant: int,
+    drop_length: int,
+    drop_width: int,
+    drop_color: tuple,
+    blur_value: int,
+    brightness_coefficient: float,
+    rain_drops: np.ndarray,
+) -> np.ndarray:
+    """Add rain to uint8 image, all drops are drawn by single OpenCV call."""
+    image = image.copy()
+
+    # Drops : Lines from (x, y) to (x + slant, y + drop_length)
+    if len(rain_drops) != 0:
+        starts = rain_drops.reshape(-1, 1, 2)
+        ends = starts + np.array([slant, drop_length], dtype=np.int32)
+        cv2.polylines(
+            image,
+            np.concatenate([starts, ends], axis=1),
+            isClosed=False,
+            color=drop_color,
+            thickness=drop_width,
+        )
+
+    # Rainy view is blurry and shady, all in place of the copy
+    cv2.blur(image, (blur_value, blur_value), dst=image)
+    cv2.cvtColor(image, cv2.COLOR_RGB2HSV, dst=image)
+    np.multiply(
+        image[:, :, 2],
+        np.float32(brightness_coefficient),
+        out=image[:, :, 2],
+        dtype=np.float32,
+        casting="unsafe",
+    )
+    cv2.cvtColor(image, cv2.COLOR_HSV2RGB, dst=image)
+
+    return image
+
+
+@lru_cache(maxsize=32)
+def sun_flare_steps(src_radius: int) -> tuple:
+    """Returns (radius, alpha) steps of flare source, cached per radius."""
+    num_times = src_radius // 10
+    alpha = np.linspace(0.0, 1, num=num_times)
+    rad = np.linspace(1, src_radius, num=num_times)
+
+    steps = []
+    for i in range(num_times):
+        alp = alpha[num_times - i - 1]
+        steps.append((int(rad[i]), float(alp * alp * alp)))
+
+    return tuple(steps)
+
+
+def add_sun_flare(
+    image: np.ndarray,
+    flare_center_x: float,
+    flare_center_y: float,
+    src_radius: int,
+    src_color: tuple,
+    circles: list,
+) -> np.ndarray:
+    """Add sun flare to uint8 image, blending only regions with circles."""
+    height, width = image.shape[:2]
+    output = image.copy()
+
+    # Circles : Outside of drawn circles overlay equals output, blend is no-op
+    x0, y0, x1, y1 = width, height, 0, 0
+    for _alpha, (x, y), rad3, _color in circles:
+        x0, y0 = max(0, min(x0, x - rad3)), max(0, min(y0, y - rad3))
+        x1, y1 = min(width, max(x1, x + rad3 + 1)), min(height, max(y1, y + rad3 + 1))
+
+    # Circles : Overlay only of their bounding box, not whole image
+    if (x0 < x1) and (y0 < y1):
+        roi = output[y0:y1, x0:x1]
+        overlay = roi.copy()
+        for alpha, (x, y), rad3, color in circles:
+            cv2.circle(overlay, (x - x0, y - y0), rad3, color, -1)
+            roi[:] = cv2.addWeighted(overlay, alpha, roi, 1 - alpha, 0)
+
+    # Source : Concentric circles, blend only their bounding box
+    x, y = int(flare_center_x), int(flare_center_y)
+    x0, y0 = max(0, x - src_radius), max(0, y - src_radius)
+    x1, y1 = min(width, x + src_radius + 1), min(height, y + src_radius + 1)
+    if (x0 < x1) and (y0 < y1):
+        roi = output[y0:y1, x0:x1]
+        overlay = roi.copy()
+        for radius, alpha in sun_flare_steps(src_radius):
+            cv2.circle(overlay, (x - x0, y - y0), radius, src_color, -1)
+            roi[:] = cv2.addWeighted(overlay, alpha, roi, 1 - alpha, 0)
+
+    return output
+
+
+class FastRain(A.RandomRain):
+    """RandomRain with drops sampled and drawn without python loops."""
+
+    def apply(self, image, slant=10, drop_length=20, rain_drops=(), **params):
+        # Float : Draw on uint8 copy, same as RandomRain
+        if image.dtype == np.float32:
+            image = A.from_float(image, dtype=np.dtype("uint8"))
+            return A.to_float(
+                self.apply(image, slant, drop_length, rain_drops), max_value=255
+            )
+
+        if image.dtype != np.uint8:
+            raise ValueError(f"Unexpected dtype {image.dtype} for FastRain!")
+
+        return add_rain(
+            image,
+            slant,
+            drop_length,
+            self.drop_width,
+            self.drop_color,
+            self.blur_value,
+            self.brightness_coefficient,
+            rain_drops,
+        )
+
+    def get_params_dependent_on_targets(self, params):
+        img = params["image"]
+        slant = int(random.uniform(self.slant_lower, self.slant_upper))
+
+        height, width = img.shape[:2]
+        area = height * width
+
+        if self.rain_type == "drizzle":
+            num_drops = area // 770
+            drop_length = 10
+        elif self.rain_type == "heavy":
+            num_drops = area // 600
+            drop_length = 30
+        elif self.rain_type == "torrential":
+            num_drops = area // 500
+            drop_length = 60
+        else:
+            drop_length = self.drop_length
+            num_drops = area // 600
+
+        # Drops : Sample all (x, y) at once, bounds inclusive as in RandomRain
+        rain_drops = np.empty((num_drops, 2), dtype=np.int32)
+        rain_drops[:, 0] = np.random.randint(
+            min(slant, 0), width - max(slant, 0) + 1, size=num_drops
+        )
+        rain_drops[:, 1] = np.random.randint(
+            0, height - drop_length + 1, size=num_drops
+        )
+
+        return {"drop_length": drop_length, "slant": slant, "rain_drops": rain_drops}
+
+
+class FastSunFlare(A.RandomSunFlare):
+    """RandomSunFlare blending only flare regions, not whole image."""
+
+    def apply(
+        self, image, flare_center_x=0.5, flare_center_y=0.5, circles=(), **params
+    ):
+        # Float : Draw on uint8 copy, same as RandomSunFlare
+        if image.dtype == np.float32:
+            image = A.from_float(image, dtype=np.dtype("uint8"))
+            return A.to_float(
+                self.apply(image, flare_center_x, flare_center_y, circles),
+                max_value=255,
+            )
+
+        if image.dtype != np.uint8:
+            raise ValueError(f"Unexpected dtype {image.dtype} for FastSunFlare!")
+
+        return add_sun_flare(
+            image,
+            flare_center_x,
+            flare_center_y,
+            self.src_radius,
+            self.src_color,
+            circles,
+        )
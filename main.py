@@ -1,17 +1,35 @@
 #!/usr/bin/python3
 import argparse
 import logging
+import multiprocessing
 import os
 import random
 import sys
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from pathlib import Path
 from typing import Optional
 
-from tqdm import tqdm
-
-from helpers.annotations import ReadAnnotations
-from helpers.augumentations import (
-    Augment,
+# Threads : Limit native thread pools, before numpy and OpenCV are loaded
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+from tqdm import tqdm  # noqa: E402
+
+from helpers.annotations import Annotations, ReadAnnotations  # noqa: E402
+from helpers.augumentations import (  # noqa: E402
+    AugmentMany,
+    GetCreatedPaths,
+    IsSaved,
+    ReadImage,
+    Transformation,
     transform_all,
     transform_blackboxing_make,
     transform_blur_delicate_make,
@@ -44,9 +62,10 @@ from helpers.augumentations import (
     transform_spatter_make,
     transform_spatter_small_make,
     transform_sunflare_make,
+    writer,
 )
-from helpers.files import IsImageFile
-from helpers.scene_matching import transform_night_make
+from helpers.files import ChangeExtension, IsImageFile  # noqa: E402
+from helpers.scene_matching import transform_night_make  # noqa: E402
 
 
 def GetImages(path: str) -> list:
@@ -64,6 +83,430 @@ def GetImages(path: str) -> list:
     return filenames
 
 
+def ParseDevice(device: str) -> str:
+    """Parse --device argument, accepts cpu, cuda or cuda:N."""
+    device = device.lower()
+    if device in ("cpu", "cuda"):
+        return device
+
+    prefix, _, index = device.partition(":")
+    if (prefix != "cuda") or (not index.isdigit()):
+        raise argparse.ArgumentTypeError(
+            f"Invalid device {device}, expected cpu, cuda or cuda:N!"
+        )
+
+    return device
+
+
+def IsGpuAugmentation(arguments: argparse.Namespace) -> bool:
+    """Returns True if -aa, -as or -ac augmentation runs on GPU."""
+    return (arguments.device != "cpu") and (
+        arguments.augumentColor or arguments.augumentShape or arguments.augumentAll
+    )
+
+
+def ConfigureOpenCV():
+    """Disable OpenCV internal threading and OpenCL, enable SIMD code."""
+    # OpenCV : Disable internal threads, images are processed in parallel
+    cv2.setNumThreads(0)
+    cv2.ocl.setUseOpenCL(False)
+    # OpenCV : Use optimized (SIMD) code paths
+    cv2.setUseOptimized(True)
+
+
+def MakeTransformations(arguments: argparse.Namespace) -> list:
+    """Create list of transformations enabled by arguments."""
+    transformations = []
+
+    # Crop :
+    if arguments.crop != 0:
+        transformations.append(
+            Transformation("crop", transform_crop_make(arguments.crop))
+        )
+
+    # Rotate :
+    if arguments.rotate != 0:
+        transformations.append(
+            Transformation("rotate", transform_rotate_make(arguments.rotate))
+        )
+
+    # RandRotate :
+    if arguments.randrotate != 0:
+        transformations.append(
+            Transformation(
+                "randrotate", transform_randrotate_make(arguments.randrotate)
+            )
+        )
+
+    # Flip Horizontal : Image
+    if arguments.flip_horizontal:
+        transformations.append(
+            Transformation("flip_horizontal", transform_flip_horizontal_make())
+        )
+
+    # Flip Vertical : Image
+    if arguments.flip_vertical:
+        transformations.append(
+            Transformation("flip_vertical", transform_flip_vertical_make())
+        )
+
+    # Flip : Image
+    if arguments.flip:
+        transformations.append(Transformation("flip", transform_flip_make()))
+
+    # Color shift : Image
+    if arguments.colorshift:
+        transformations.append(
+            Transformation("colorshift", transform_colorshift_make())
+        )
+
+    # CLAHE : Image
+    if arguments.clahe:
+        transformations.append(Transformation("clahe", transform_clahe_make()))
+
+    # Equalize : Image
+    if arguments.equalize:
+        transformations.append(Transformation("equalize", transform_equalize_make()))
+
+    # Sharpen : Image
+    if arguments.sharpen:
+        transformations.append(Transformation("sharpen", transform_sharpen_make()))
+
+    # Darken : Image
+    if arguments.darken:
+        transformations.append(Transformation("darken", transform_darken_make()))
+
+    # Brighten : Image
+    if arguments.brighten:
+        transformations.append(Transformation("brighten", transform_brighten_make()))
+
+    # IsoNoise : Image
+    if arguments.isonoise:
+        transformations.append(Transformation("isonoise", transform_isonoise_make()))
+
+    # GaussNoise : Image
+    if arguments.gaussnoise:
+        transformations.append(
+            Transformation("gaussnoise", transform_gaussnoise_make())
+        )
+
+    # MultiNoise : Image
+    if arguments.multi_noise:
+        transformations.append(
+            Transformation("multi_noise", transform_multinoise_make())
+        )
+
+    # compression : Quality
+    if arguments.compression:
+        transformations.append(
+            Transformation("compression", transform_compression_make())
+        )
+
+    # Downsize padding : Image
+    if arguments.downsize_padding:
+        transformations.append(
+            Transformation("downsize_padding", transform_downsize_padding_make())
+        )
+
+    # Degrade : Image
+    if arguments.degrade:
+        transformations.append(Transformation("degrade", transform_degrade_make()))
+
+    # Snow : Image
+    if arguments.snow:
+        transformations.append(Transformation("snow", transform_snow_make()))
+
+    # Rain : Image
+    if arguments.rain:
+        transformations.append(Transformation("rain", transform_rain_make()))
+
+    # Fog : Image
+    if arguments.fog:
+        transformations.append(Transformation("fog", transform_fog_make()))
+
+    # Spatter : Image
+    if arguments.spatter:
+        transformations.append(Transformation("spatter", transform_spatter_make()))
+
+    # Spatter big : Image
+    if arguments.spatter_big:
+        transformations.append(
+            Transformation("spatter_big", transform_spatter_big_make())
+        )
+
+    # Spatter small : Image
+    if arguments.spatter_small:
+        transformations.append(
+            Transformation("spatter_small", transform_spatter_small_make())
+        )
+
+    # Blackboxing : Image
+    if arguments.blackboxing:
+        transformations.append(
+            Transformation(
+                "blackboxing",
+                transform_blackboxing_make(size=arguments.blackboxing),
+                is_bboxes_transform=False,
+            )
+        )
+
+    # Sunflare : Image
+    if arguments.sunflare:
+        transformations.append(Transformation("sunflare", transform_sunflare_make()))
+
+    # Blur : Image
+    if arguments.blur:
+        transformations.append(Transformation("blur", transform_blur_make()))
+
+    # Blur delicate : Image
+    if arguments.blur_delicate:
+        transformations.append(
+            Transformation("blur_delicate", transform_blur_delicate_make())
+        )
+
+    # Median Blur : Image
+    if arguments.medianblur:
+        transformations.append(
+            Transformation("medianblur", transform_median_blur_make())
+        )
+
+    # Night : Image
+    if arguments.night:
+        transformations.append(Transformation("night", transform_night_make()))
+
+    # Augmentate : On GPU by kornia, imported only if requested
+    useGpu = IsGpuAugmentation(arguments)
+    if useGpu:
+        from helpers.kornia_augumentations import (
+            transform_all_gpu_make,
+            transform_color_gpu_make,
+            transform_shape_gpu_make,
+        )
+
+    # Augmentate : Color
+    if arguments.augumentColor:
+        augment_color = (
+            transform_color_gpu_make(arguments.device) if useGpu else transform_color
+        )
+        transformations.append(Transformation("augment_color", augment_color))
+    # Augmentate : Shape
+    elif arguments.augumentShape:
+        augment_shape = (
+            transform_shape_gpu_make(arguments.device) if useGpu else transform_shape
+        )
+        transformations.append(Transformation("augment_shape", augment_shape))
+    # Augmentate : All
+    elif arguments.augumentAll:
+        augment_all = (
+            transform_all_gpu_make(arguments.device) if useGpu else transform_all
+        )
+        transformations.append(Transformation("augment_all", augment_all))
+
+    return transformations
+
+
+# Transformations : Created once per worker process
+worker_transformations: list = []
+# Writer : Pending saves of images augmented by this process
+worker_saving: deque = deque()
+# Writer : Barrier of worker processes, every worker takes one flush
+worker_barrier = None
+# Writer : Maximum number of images with pending saves
+writerBacklog = 4
+
+
+def SeedRandom(seed: Optional[int] = None):
+    """Seed python and numpy random generators, None seeds from OS entropy."""
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def InitWorker(arguments: argparse.Namespace, workersCounter=None, workersBarrier=None):
+    """Initialize worker process."""
+    global worker_transformations, worker_barrier
+    # OpenCV : Configure also here, spawned workers skip __main__
+    ConfigureOpenCV()
+
+    # Worker : Index from shared counter, 0 for single process
+    workerIndex = 0
+    if workersCounter is not None:
+        with workersCounter.get_lock():
+            workerIndex = workersCounter.value
+            workersCounter.value += 1
+
+    # Random : Seed once per process, forked workers inherit the same state
+    if arguments.seed is None:
+        SeedRandom()
+    else:
+        SeedRandom(arguments.seed + workerIndex)
+    # Transformations : Create once, not for every image
+    worker_transformations = MakeTransformations(arguments)
+    worker_barrier = workersBarrier
+
+
+def ProcessImage(
+    imagePath: str,
+    outputPath: str,
+    arguments: argparse.Namespace,
+    annotations: Optional[Annotations] = None,
+    image: Optional[np.ndarray] = None,
+) -> list:
+    """Augment single image, returns its pending saves."""
+    # Annotations : Ready annotations if exists and not already read
+    if annotations is None:
+        annotations = ReadAnnotations(imagePath)
+
+    # Check : Skip if not all images and not annotated.
+    if (arguments.all is False) and (annotations.exists is False):
+        logging.warning(
+            f"Annotations not found for {imagePath}! Please provide annotations first or add --all !"
+        )
+        return []
+
+    return AugmentMany(
+        imagePath,
+        outputPath,
+        annotations,
+        worker_transformations,
+        use_sha=not arguments.disable_sha,
+        image=image,
+        output_format=arguments.output_format,
+    )
+
+
+def CollectSaves(saving: deque, keep: int = 0) -> list:
+    """Pop finished saves of images, returns created paths per image.
+
+    Oldest images are waited for, while more than keep images are pending.
+    """
+    results = []
+    while (len(saving) != 0) and ((len(saving) > keep) or IsSaved(saving[0])):
+        results.append(GetCreatedPaths(saving.popleft()))
+
+    return results
+
+
+def ProcessWorkerImage(
+    imagePath: str, outputPath: str, arguments: argparse.Namespace
+) -> list:
+    """Augment single image in worker process.
+
+    Saves are left pending in worker, returns created paths per image of this
+    or previous images, which saves are finished.
+    """
+    worker_saving.append(ProcessImage(imagePath, outputPath, arguments))
+    return CollectSaves(worker_saving, keep=writerBacklog)
+
+
+def FlushWorker() -> list:
+    """Wait for all pending saves of worker process, returns created paths per image."""
+    # Barrier : Hold this worker, so every worker takes exactly one flush
+    worker_barrier.wait()
+    return CollectSaves(worker_saving)
+
+
+def LoadImage(imagePath: str) -> tuple:
+    """Read image annotations and image."""
+    return imagePath, ReadAnnotations(imagePath), ReadImage(imagePath)
+
+
+def Prefetch(function, items: list, size: int = 4):
+    """Yields function results for items, computing next ones in background."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    pending: deque = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) > size:
+                yield pending.popleft().result()
+
+        while len(pending) != 0:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def ProcessSerial(images: list, outputPath: str, arguments: argparse.Namespace):
+    """Process images in this process, yields created paths per image."""
+    InitWorker(arguments)
+    # Counter : Of images which created output
+    created_counter = 0
+    # Writer : Pending saves, next images are augmented meanwhile
+    saving: deque = deque()
+    # Prefetch : Read next images while current one is augmented
+    for imagePath, annotations, image in Prefetch(LoadImage, images):
+        # Writer : Wait for pending saves, which could reach iterations
+        while (len(saving) != 0) and (
+            created_counter + len(saving) >= arguments.iterations
+        ):
+            created_paths = GetCreatedPaths(saving.popleft())
+            if len(created_paths) != 0:
+                created_counter += 1
+            yield created_paths
+
+        saving.append(
+            ProcessImage(imagePath, outputPath, arguments, annotations, image)
+        )
+        for created_paths in CollectSaves(saving, keep=writerBacklog):
+            if len(created_paths) != 0:
+                created_counter += 1
+            yield created_paths
+
+    # Writer : Drain once at the end
+    writer.shutdown(wait=True)
+    yield from CollectSaves(saving)
+
+
+def ProcessParallel(
+    images: list, outputPath: str, arguments: argparse.Namespace, workers: int
+):
+    """Process images in worker processes, yields created paths per image."""
+    # Counter : Of images which created output
+    created_counter = 0
+    # Counter : Of submitted images, which saves are not resolved yet
+    unresolved_counter = 0
+    # Workers : Shared counter, gives every worker its own seed
+    workersCounter = multiprocessing.Value("i", 0)
+    # Workers : Barrier, every worker flushes its pending saves
+    workersBarrier = multiprocessing.Barrier(workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=InitWorker,
+        initargs=(arguments, workersCounter, workersBarrier),
+    ) as executor:
+        pending = set()
+        imagesIterator = iter(images)
+        while True:
+            # Submit : Keep workers busy, but never exceed iterations
+            while (len(pending) < 2 * workers) and (
+                created_counter + unresolved_counter < arguments.iterations
+            ):
+                imagePath = next(imagesIterator, None)
+                if imagePath is None:
+                    break
+                pending.add(
+                    executor.submit(
+                        ProcessWorkerImage, imagePath, outputPath, arguments
+                    )
+                )
+                unresolved_counter += 1
+
+            if len(pending) == 0:
+                # Check : All images processed
+                if unresolved_counter == 0:
+                    break
+                # Writer : Saves are pending only in workers, flush them
+                pending = {executor.submit(FlushWorker) for _ in range(workers)}
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for created_paths in future.result():
+                    unresolved_counter -= 1
+                    if len(created_paths) != 0:
+                        created_counter += 1
+                    yield created_paths
+
+
 def Process(path: str, arguments: argparse.Namespace):
     """Process directory"""
     # Check : Path is None or empty
@@ -81,487 +524,52 @@ def Process(path: str, arguments: argparse.Namespace):
         logging.error("No images found in directory!")
         return
 
+    # Images : Only annotated, if not all images requested
+    if arguments.all is False:
+        annotated = [
+            imagePath
+            for imagePath in images
+            if os.path.exists(ChangeExtension(imagePath, ".txt"))
+        ]
+        if len(annotated) != len(images):
+            logging.warning(
+                f"Skipped {len(images) - len(annotated)} images without annotations! Please provide annotations first or add --all !"
+            )
+        images = annotated
+
+        if len(images) == 0:
+            logging.error("No annotated images found in directory!")
+            return
+
     # Random : Shuffle all images for randomization
+    SeedRandom(arguments.seed)
     random.shuffle(images)
 
+    # Workers : Number of parallel processes
+    workers = max(1, arguments.workers)
+    # Workers : CUDA is used from single process, not from forked workers
+    if IsGpuAugmentation(arguments) and (workers != 1):
+        logging.info("Using single worker with CUDA device.")
+        workers = 1
+
     # Counter : Of processed images
     processed_counter = 0
     # Preview: ProgressBar : Create
-    progress = tqdm(total=args.iterations, desc="Augumentation", unit="images")
+    progress = tqdm(total=arguments.iterations, desc="Augumentation", unit="images")
     # Step 1 - augment current images and make new
-    for imagePath in images:
-        # Created path : None
-        created_path: Optional[str] = None
-        # Annotations : Ready annotations if exists
-        annotations = ReadAnnotations(imagePath)
-
-        # Check : Continue if not all images and not annotated.
-        if (arguments.all is False) and (annotations.exists is False):
-            logging.warning(
-                f"Annotations not found for {imagePath}! Please provide annotations first or add --all !"
-            )
-            continue
-
-        use_sha = not arguments.disable_sha
-
-        # Crop :
-        if arguments.crop != 0:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_crop_make(arguments.crop),
-                    transformation_name="crop",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Cropping image failed: {e}")
-
-        # Rotate :
-        if arguments.rotate != 0:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_rotate_make(arguments.rotate),
-                    transformation_name="rotate",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Rotating image failed: {e}")
-
-        # RandRotate :
-        if arguments.randrotate != 0:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_randrotate_make(arguments.randrotate),
-                    transformation_name="randrotate",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Rotating image failed: {e}")
-
-        # Flip Horizontal : Image
-        if arguments.flip_horizontal:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_flip_horizontal_make(),
-                    transformation_name="flip_horizontal",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Flipping image failed: {e}")
-
-        # Flip Vertical : Image
-        if arguments.flip_vertical:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_flip_vertical_make(),
-                    transformation_name="flip_vertical",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Flipping image failed: {e}")
-
-        # Flip : Image
-        if arguments.flip:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_flip_make(),
-                    transformation_name="flip",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Flipping image failed: {e}")
-
-        # Color shift : Image
-        if arguments.colorshift:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_colorshift_make(),
-                    transformation_name="colorshift",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Color shifting image failed: {e}")
-
-        # CLAHE : Image
-        if arguments.clahe:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_clahe_make(),
-                    transformation_name="clahe",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"CLAHE image failed: {e}")
-
-        # Equalize : Image
-        if arguments.equalize:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_equalize_make(),
-                    transformation_name="equalize",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Equalizing image failed: {e}")
-
-        # Sharpen : Image
-        if arguments.sharpen:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_sharpen_make(),
-                    transformation_name="sharpen",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Sharpening image failed: {e}")
-
-        # Darken : Image
-        if arguments.darken:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_darken_make(),
-                    transformation_name="darken",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Darkening image failed: {e}")
-
-        # Brighten : Image
-        if arguments.brighten:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_brighten_make(),
-                    transformation_name="brighten",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Brightening image failed: {e}")
-
-        # IsoNoise : Image
-        if arguments.isonoise:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_isonoise_make(),
-                    transformation_name="isonoise",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Adding iso noise to image failed: {e}")
-
-        # GaussNoise : Image
-        if arguments.gaussnoise:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_gaussnoise_make(),
-                    transformation_name="gaussnoise",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Adding gauss noise to image failed: {e}")
-
-        # MultiNoise : Image
-        if arguments.multi_noise:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_multinoise_make(),
-                    transformation_name="multi_noise",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Adding multi gauss noise to image failed: {e}")
-
-        # compression : Quality
-        if arguments.compression:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_compression_make(),
-                    transformation_name="compression",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Degrading image failed: {e}")
-
-        # Downsize padding : Image
-        if arguments.downsize_padding:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_downsize_padding_make(),
-                    transformation_name="downsize_padding",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Degrading image failed: {e}")
-
-        # Degrade : Image
-        if arguments.degrade:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_degrade_make(),
-                    transformation_name="degrade",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Degrading image failed: {e}")
-
-        # Snow : Image
-        if arguments.snow:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_snow_make(),
-                    transformation_name="snow",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Snowing image failed: {e}")
-
-        # Rain : Image
-        if arguments.rain:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_rain_make(),
-                    transformation_name="rain",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Raining image failed: {e}")
-
-        # Fog : Image
-        if arguments.fog:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_fog_make(),
-                    transformation_name="fog",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Fogging image failed: {e}")
-
-        # Spatter : Image
-        if arguments.spatter:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_spatter_make(),
-                    transformation_name="spatter",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Spattering image failed: {e}")
-
-        # Spatter big : Image
-        if arguments.spatter_big:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_spatter_big_make(),
-                    transformation_name="spatter_big",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Spattering big image failed: {e}")
-
-        # Spatter small : Image
-        if arguments.spatter_small:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_spatter_small_make(),
-                    transformation_name="spatter_small",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Spattering small image failed: {e}")
-
-        # Blackboxing : Image
-        if arguments.blackboxing:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_blackboxing_make(size=arguments.blackboxing),
-                    transformation_name="blackboxing",
-                    is_bboxes_transform=False,
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Blackboxing image failed: {e}")
-
-        # Sunflare : Image
-        if arguments.sunflare:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_sunflare_make(),
-                    transformation_name="sunflare",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Sunflaring image failed: {e}")
-
-        # Blur : Image
-        if arguments.blur:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_blur_make(),
-                    transformation_name="blur",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Blurring image failed: {e}")
-
-        # Blur delicate : Image
-        if arguments.blur_delicate:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_blur_delicate_make(),
-                    transformation_name="blur_delicate",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Delicate blurring image failed: {e}")
-
-        # Median Blur : Image
-        if arguments.medianblur:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_median_blur_make(),
-                    transformation_name="medianblur",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Median blurring image failed: {e}")
-
-        # Night : Image
-        if arguments.night:
-            try:
-                created_path = Augment(
-                    imagePath,
-                    outputPath,
-                    annotations,
-                    transform_night_make(),
-                    transformation_name="night",
-                    use_sha=use_sha,
-                )
-            except Exception as e:
-                logging.error(f"Night vision image failed: {e}")
-
-        # Augmentate : Color
-        if arguments.augumentColor:
-            created_path = Augment(
-                imagePath,
-                outputPath,
-                annotations,
-                transform_color,
-                transformation_name="augment_color",
-                use_sha=use_sha,
-            )
-        # Augmentate : Shape
-        elif arguments.augumentShape:
-            created_path = Augment(
-                imagePath,
-                outputPath,
-                annotations,
-                transform_shape,
-                transformation_name="augment_shape",
-                use_sha=use_sha,
-            )
-        # Augmentate : All
-        elif arguments.augumentAll:
-            created_path = Augment(
-                imagePath,
-                outputPath,
-                annotations,
-                transform_all,
-                transformation_name="augment_all",
-                use_sha=use_sha,
-            )
+    if workers == 1:
+        results = ProcessSerial(images, outputPath, arguments)
+    else:
+        results = ProcessParallel(images, outputPath, arguments, workers)
 
-        # Check : Created path is None
-        if created_path is None:
+    for created_paths in results:
+        # Check : Nothing created
+        if len(created_paths) == 0:
             continue
 
-        # Logging : Created image
-        logging.info(f"Created {created_path}!")
+        # Logging : Created images
+        for created_path in created_paths:
+            logging.info(f"Created {created_path}!")
 
         # Counter : Increment
         processed_counter += 1
@@ -579,6 +587,9 @@ if __name__ == "__main__":
         logging.basicConfig(stream=sys.stderr, level=logging.INFO)
     logging.debug("Logging enabled!")
 
+    # OpenCV : Configure before any image is processed
+    ConfigureOpenCV()
+
     # Arguments and config
     parser = argparse.ArgumentParser()
     parser.add_argument("-i", "--input", type=str, required=True, help="Input path")
@@ -599,6 +610,36 @@ if __name__ == "__main__":
         required=False,
         help="Disable SHA and append transformation type to filename",
     )
+    parser.add_argument(
+        "--output_format",
+        type=str,
+        choices=["jpeg", "npy"],
+        default="jpeg",
+        required=False,
+        help="Output image format. npy saves raw uint8 arrays, no decoding needed for training.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        required=False,
+        help="Number of parallel worker processes. Default is number of CPUs.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        required=False,
+        help="Random seed, outputs are reproducible with -j 1.",
+    )
+    parser.add_argument(
+        "--device",
+        type=ParseDevice,
+        default="cpu",
+        required=False,
+        help="Device for -aa, -as and -ac augmentations: cpu, cuda or cuda:N (requires torch and kornia).",
+    )
     parser.add_argument(
         "-a",
         "--all",